@@ -1,9 +1,64 @@
-import json
-import re
-import requests
-
-
-def validate_filter_input(filter_type, filter, filter_type_map):
+import argparse
+import functools
+import operator
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+import requests_cache
+import simdjson
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+_BASE_URL = "https://www.thecocktaildb.com/api/json/v1/1"
+_FILTER_TYPE_MAP = {
+    "name": "/search.php?s=",
+    "letter": "/search.php?f=",
+    "random": "/random.php",
+    "ingredient": "/filter.php?i=",
+    "alcoholic": "/filter.php?a=",
+    "category": "/filter.php?c=",
+    "glass": "/filter.php?g=",
+}
+
+# TheCocktailDB exposes up to 15 numbered ingredient/measure pairs per drink
+_INGREDIENT_KEYS = tuple(
+    (f"strIngredient{i}", f"strMeasure{i}") for i in range(1, 16)
+)
+
+# Fixed drink fields copied into the transformed output, fetched in one call
+_DRINK_FIELDS = operator.itemgetter(
+    "strDrink",
+    "strCategory",
+    "strAlcoholic",
+    "strGlass",
+    "strInstructions",
+    "strDrinkThumb",
+)
+
+# Shared session so repeated API calls reuse pooled keep-alive connections.
+# Only drink lookups by ID are cached on disk (in the user cache directory);
+# random picks and search/filter listings must always hit the API
+_SESSION = requests_cache.CachedSession(
+    "cocktail_cache",
+    backend="sqlite",
+    use_cache_dir=True,
+    urls_expire_after={
+        "*/lookup.php*": 3600,
+        "*": requests_cache.DO_NOT_CACHE,
+    },
+)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+_REQUEST_TIMEOUT = 10
+_FETCH_WORKERS = 16
+
+
+def _filter_error(filter_type, filter, message):
+    # Only built on the failure path of validate_filter_input
+    return f"{{Filter Type: '{filter_type}', Filter Input: '{filter}'}} - {message}"
+
+
+def validate_filter_input(filter_type, filter, filter_type_map=_FILTER_TYPE_MAP):
     """
     Validate the filter input based on the filter type and filter type map.
 
@@ -11,32 +66,41 @@ def validate_filter_input(filter_type, filter, filter_type_map):
         filter_type (str): The type of filter to validate.
         filter (str): The filter value to validate.
         filter_type_map (dict): The mapping of filter types to their URLs.
+            Defaults to the API's filter type map.
 
     Raises:
         KeyError: If the filter type is not in the filter type map.
         ValueError: If the filter input does not meet the requirements for the "letter" filter type.
         TypeError: If the filter input is not alphanumeric for the "letter" filter type.
     """
-    error_prefix = f"{{Filter Type: '{filter_type}', Filter Input: '{filter}'}} - "
-
     # Check if the filter type exists in the map
     if filter_type not in filter_type_map:
         raise KeyError(
-            error_prefix + "The filter type does not exist in the filter type map."
+            _filter_error(
+                filter_type,
+                filter,
+                "The filter type does not exist in the filter type map.",
+            )
         )
 
-    # Additional checks for "letter" filter type
-    if filter_type == "letter":
+    # Additional checks for "letter" filter type; valid input passes a single
+    # combined check and the specific error is only resolved on failure
+    if filter_type == "letter" and not (len(filter) == 1 and filter.isalnum()):
         if len(filter) != 1:
             raise ValueError(
-                error_prefix
-                + "The filter input must be a single character when Filter Type is 'letter'."
+                _filter_error(
+                    filter_type,
+                    filter,
+                    "The filter input must be a single character when Filter Type is 'letter'.",
+                )
             )
-        if not filter.isalnum():
-            raise TypeError(
-                error_prefix
-                + "The filter input must be an alphanumeric character when Filter Type is 'letter'."
+        raise TypeError(
+            _filter_error(
+                filter_type,
+                filter,
+                "The filter input must be an alphanumeric character when Filter Type is 'letter'.",
             )
+        )
 
 
 def construct_url(filter_type, filter):
@@ -54,32 +118,24 @@ def construct_url(filter_type, filter):
         KeyError: If the filter type does not exist in the filter type map.
         ValueError: If the filter input does not meet the requirements for the "letter" filter type.
     """
-    base_url = "https://www.thecocktaildb.com/api/json/v1/1"
-    filter_type_map = {
-        "name": "/search.php?s=",
-        "letter": "/search.php?f=",
-        "random": "/random.php",
-        "ingredient": "/filter.php?i=",
-        "alcoholic": "/filter.php?a=",
-        "category": "/filter.php?c=",
-        "glass": "/filter.php?g=",
-    }
-
     # Validate the input first
-    validate_filter_input(filter_type, filter, filter_type_map)
+    validate_filter_input(filter_type, filter)
 
     # Handle the "random" filter type with early return
     if filter_type == "random":
-        return f"{base_url}{filter_type_map[filter_type]}"
+        return f"{_BASE_URL}{_FILTER_TYPE_MAP[filter_type]}"
 
     # Construct and return the full URL
-    return f"{base_url}{filter_type_map[filter_type]}{filter}"
+    return f"{_BASE_URL}{_FILTER_TYPE_MAP[filter_type]}{filter}"
 
 
 def fetch_drink_by_id(id):
     """
     Fetch drink details by ID.
 
+    Results are cached per ID, so repeated lookups skip the API call. Each
+    call returns its own copy, so callers may modify it freely.
+
     Args:
         id (str): The ID of the drink to fetch.
 
@@ -98,13 +154,22 @@ def fetch_drink_by_id(id):
     if not id.isdigit():
         raise ValueError(f"{{ID: '{id}'}} - The ID must be numeric.")
 
+    return dict(_fetch_drink_by_id(id))
+
+
+@functools.lru_cache(maxsize=4096)
+def _fetch_drink_by_id(id):
     # Make a GET request to the API endpoint
-    url = f"https://www.thecocktaildb.com/api/json/v1/1/lookup.php?i={id}"
-    response = requests.get(url)
+    url = f"{_BASE_URL}/lookup.php?i={id}"
+    response = _SESSION.get(url, timeout=_REQUEST_TIMEOUT)
     response.raise_for_status()  # Raises HTTPError for non-200 responses
 
     # Parse JSON response
-    posts = response.json()
+    try:
+        posts = orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(
+            f"{{ID: '{id}'}} - Received an invalid response from the API call: {e}")
 
     # Check if 'drinks' key is present and contains data
     if not posts.get("drinks"):
@@ -133,81 +198,137 @@ def fetch_data_by_filter(filter_type, filter):
     url = construct_url(filter_type, filter)
 
     # Make the API call
-    response = requests.get(url)
+    response = _SESSION.get(url, timeout=_REQUEST_TIMEOUT)
     response.raise_for_status()  # Raises HTTPError for bad responses
 
     # Check if the response is empty
-    if not response.text.strip():
+    if not response.content.strip():
         raise ValueError("Received an empty response from the API call.")
 
-    # Parse JSON response
-    fetched_data = response.json()
-
     # Process the data for specific filter types
     if filter_type in {"ingredient",  "alcoholic", "category", "glass"}:
         print("Filter APIs require extra processing...")
-        new_fetched_data = {"drinks": []}
-        drinks_list = fetched_data.get("drinks", [])
-        total = len(drinks_list)
-        interval = max(total // 10, 1)  # Ensure minimum interval of 1
-
-        for index, drink in enumerate(drinks_list, start=1):
-            if index == 1 or index % interval == 0 or index == total:
-                print(f"Processing entry {index} of {total}...")
 
-            # Fetch additional details for each drink
-            drink_data = fetch_drink_by_id(drink["idDrink"])
-            if drink_data:
-                new_fetched_data["drinks"].append(drink_data)
-
-        fetched_data = new_fetched_data
-
-    return fetched_data
+        # Filter APIs only list drink IDs, so parse lazily and materialize
+        # just the idDrink values
+        try:
+            doc = simdjson.Parser().parse(response.content)
+        except ValueError as e:
+            raise ValueError(
+                f"Received an invalid response from the API call: {e}")
+        drinks_list = doc.get("drinks") or []
+        drink_ids = [drink["idDrink"] for drink in drinks_list]
 
+        new_fetched_data = {"drinks": []}
 
-def transform_drinks(data):
-    transformed_data = []
+        # Fetch additional details for each drink concurrently; results are
+        # yielded in the original order of drink_ids
+        with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as pool:
+            results = pool.map(fetch_drink_by_id, drink_ids)
+            try:
+                for drink_data in tqdm(
+                    results, total=len(drink_ids), desc="Fetching drinks"
+                ):
+                    if drink_data:
+                        new_fetched_data["drinks"].append(drink_data)
+            except BaseException:
+                # Stop on the first failed lookup instead of letting the
+                # remaining queued requests run before the error surfaces
+                pool.shutdown(cancel_futures=True)
+                raise
+
+        return new_fetched_data
 
-    for drink in data["drinks"]:
-        name_id = re.sub(r"\s+", "-", drink["strDrink"].strip().lower())
+    # Parse JSON response
+    try:
+        fetched_data = orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(
+            f"Received an invalid response from the API call: {e}")
 
-        ingredients = []
-        for i in range(1, 16):
-            ingredient = drink.get(f"strIngredient{i}")
-            measure = drink.get(f"strMeasure{i}")
+    return fetched_data
 
-            if ingredient:
-                # if measure or not measure.isalnum():
-                #     measure = "null"
-                ingredients.append({"name": ingredient, "measure": measure})
 
-        transformed_drink = {
-            "name_id": name_id,
-            "name": drink["strDrink"],
-            "category": drink["strCategory"],
-            "classification": drink["strAlcoholic"],
-            "glass": drink["strGlass"],
-            "instructions": drink["strInstructions"],
-            "image": drink["strDrinkThumb"],
-            "ingredients": ingredients,
-        }
-        transformed_data.append(transformed_drink)
+def transform_drink(drink):
+    name, category, alcoholic, glass, instructions, image = _DRINK_FIELDS(drink)
+    name_id = "-".join(name.lower().split())
+
+    ingredients = []
+    add_ingredient = ingredients.append
+    for ingredient_key, measure_key in _INGREDIENT_KEYS:
+        ingredient = drink.get(ingredient_key)
+        # Ingredients are listed contiguously, so the first empty slot ends them
+        if not ingredient:
+            break
+
+        measure = drink.get(measure_key)
+        # if measure or not measure.isalnum():
+        #     measure = "null"
+        add_ingredient({"name": ingredient, "measure": measure})
+
+    return {
+        "name_id": name_id,
+        "name": name,
+        "category": category,
+        "classification": alcoholic,
+        "glass": glass,
+        "instructions": instructions,
+        "image": image,
+        "ingredients": ingredients,
+    }
 
-    return transformed_data
 
+def transform_drinks(data):
+    return [transform_drink(drink) for drink in data["drinks"]]
+
+
+parser = argparse.ArgumentParser(
+    description="Fetch drinks from TheCocktailDB and transform them."
+)
+parser.add_argument(
+    "--verbose",
+    action="store_true",
+    help="print each drink field by field instead of the JSON output",
+)
+parser.add_argument(
+    "--ndjson",
+    action="store_true",
+    help="write one compact JSON object per line to output.ndjson "
+    "instead of output.json",
+)
+args = parser.parse_args()
 
 try:
     data = fetch_data_by_filter("name", "Margarita")
     transformed_drinks = transform_drinks(data)
-    with open("output.json", "w") as file:
-        json.dump(transformed_drinks, file, indent=2)
+    if args.ndjson:
+        # One compact object per line for line-oriented downstream tools
+        output_path = "output.ndjson"
+        payload = b"".join(
+            orjson.dumps(drink, option=orjson.OPT_APPEND_NEWLINE)
+            for drink in transformed_drinks
+        )
+    else:
+        output_path = "output.json"
+        payload = orjson.dumps(transformed_drinks, option=orjson.OPT_INDENT_2)
+
+    with open(output_path, "wb") as file:
+        file.write(payload)
 
     print("\n\n<<< Printing Transformed Drinks... >>>\n\n")
 
-    for drink in transformed_drinks:
-        for key, value in drink.items():
-            print(f"{key}: {value}")
-        print("\n==========\n")
+    if args.verbose:
+        sys.stdout.write(
+            "".join(
+                "\n".join(f"{key}: {value}" for key, value in drink.items())
+                + "\n\n==========\n\n"
+                for drink in transformed_drinks
+            )
+        )
+    else:
+        # Echo the already serialized output instead of formatting it again
+        sys.stdout.write(payload.decode())
+        sys.stdout.write("\n\n")
 
     print(f"Number Of Entries: {len(transformed_drinks)}")
 except Exception as e: